@@ -1,11 +1,26 @@
+import arranque
+import time
 import uuid
 import re
+import threading
 import streamlit as st
 import pandas as pd
 import datetime as dt
+from pathlib import Path
 from zoneinfo import ZoneInfo
-import gspread
-from google.oauth2.service_account import Credentials
+from streamlit.logger import get_logger
+
+# gspread y google.oauth2 se importan recién en _get_spreadsheet(), que en
+# la primera visita corre en el hilo de precarga (ver _warm_up).
+
+log = get_logger(__name__)
+
+LOGO_PATH = Path(__file__).parent / "images" / "logoapp.png"
+
+@st.cache_resource
+def _load_logo() -> bytes:
+    """Lee el logo una sola vez por proceso"""
+    return LOGO_PATH.read_bytes()
 
 
 def setup_app():
@@ -24,7 +39,7 @@ def setup_app():
     # =========================
     col1, col2 = st.columns([1, 4])
     with col1:
-        st.image("images/logoapp.png")
+        st.image(_load_logo())
     with col2:
         st.title("💰 Finanzas APP - Jaar del Suur")
         st.markdown(
@@ -44,7 +59,6 @@ def setup_app():
 
     st.divider()
 
-setup_app()
 # =========================
 # Configuración general
 # =========================
@@ -56,24 +70,37 @@ HOJA = "finanzas"
 
 USUARIOS = ["🐳Javiera", "🪈Francis", "🎧Felipe", "🍷Feña"]
 
+# Segundos que se reutiliza la lectura de la hoja antes de volver a pedirla.
+# La caché es por réplica: con varias réplicas, las otras pueden mostrar
+# datos de hasta LEDGER_TTL segundos tras una escritura.
+LEDGER_TTL = 10
+
 
 # =========================
 # Helpers de conexión
 # =========================
 def _a1_range_row(row: int, ncols: int) -> str:
-    last_cell = gspread.utils.rowcol_to_a1(row, ncols)
+    from gspread.utils import rowcol_to_a1
+    last_cell = rowcol_to_a1(row, ncols)
     last_col = re.sub(r"\d+", "", last_cell)
     return f"A{row}:{last_col}{row}"
 
-def _open_ws(sheet_name=HOJA):
+@st.cache_resource
+def _get_spreadsheet():
+    """Autoriza y abre la planilla una sola vez por proceso"""
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     creds = Credentials.from_service_account_info(
         st.secrets["gspread"],
         scopes=["https://spreadsheets.google.com/feeds",
                 "https://www.googleapis.com/auth/drive"],
     )
     client = gspread.authorize(creds)
-    sh = client.open_by_key(SPREADSHEET_KEY)
-    return sh.worksheet(sheet_name)
+    return client.open_by_key(SPREADSHEET_KEY)
+
+def _open_ws(sheet_name=HOJA):
+    return _get_spreadsheet().worksheet(sheet_name)
 
 EXPECTED_HEADERS = [
     "ID","Tipo","Detalle","Categoría","Fecha","Persona",
@@ -102,11 +129,18 @@ def _parse_monto_raw(x) -> int:
 def _parse_fecha_any(s) -> pd.Timestamp:
     return pd.to_datetime(s, dayfirst=True, errors="coerce")
 
+@st.cache_data(ttl=LEDGER_TTL, show_spinner=False)
+def _fetch_finanzas_values() -> tuple[list[str], list[list[str]]]:
+    """Lee encabezados y filas de la hoja; se comparte entre reruns y sesiones"""
+    ws = _open_ws(HOJA)
+    headers = _ensure_sheet_headers(ws)
+    values = ws.get_all_values()
+    return headers, values
+
 def _load_finanzas_df() -> pd.DataFrame:
     try:
-        ws = _open_ws(HOJA)
-        headers = _ensure_sheet_headers(ws)
-        values = ws.get_all_values()
+        _await_warm_up()
+        headers, values = _fetch_finanzas_values()
     except Exception as e:
         st.error(f"No se pudo leer la hoja '{HOJA}': {e}")
         return pd.DataFrame(columns=EXPECTED_HEADERS)
@@ -259,12 +293,17 @@ def _form_traspaso():
             headers = _ensure_sheet_headers(ws)
             row_out = [record.get(h,"") for h in headers]
             ws.append_row(row_out, value_input_option="USER_ENTERED")
-            st.success(f"🔄 Traspaso {origen} → {destino} registrado")
+            _fetch_finanzas_values.clear()
+            st.session_state["aviso_registro"] = f"🔄 Traspaso {origen} → {destino} registrado"
+            st.rerun()
            
 
 def _form_registro(cats_existentes: list[str]):
     """Selector de tipo y despliegue del formulario correspondiente"""
     st.markdown("### ➕ Registrar movimiento")
+    aviso = st.session_state.pop("aviso_registro", None)
+    if aviso:
+        st.success(aviso)
     tipo_sel = st.radio("Selecciona tipo de movimiento", ["Ingreso","Gasto","Traspaso"], horizontal=True)
 
     if tipo_sel in ["Ingreso","Gasto"]:
@@ -388,6 +427,16 @@ def _form_editar_anular(df: pd.DataFrame):
         rownum = int(row["_row"])
         valores = row.to_dict()
 
+        # La fila viene de la caché: si otra sesión (o réplica) la cambió
+        # entretanto, no la pisamos.
+        actual = dict(zip(headers, ws.row_values(rownum)))
+        if (actual.get("ID", "") != valores.get("ID", "")
+                or actual.get("Last_Modified_At", "") != valores.get("Last_Modified_At", "")
+                or actual.get("Anulado", "") != valores.get("Anulado", "")):
+            _fetch_finanzas_values.clear()
+            st.error("⚠️ El movimiento fue modificado por otra persona. Actualiza y vuelve a intentarlo.")
+            return
+
         if anular:
             valores["Anulado"] = "TRUE"
         else:
@@ -409,6 +458,7 @@ def _form_editar_anular(df: pd.DataFrame):
 
         row_out = [valores.get(h,"") for h in headers]
         ws.update(_a1_range_row(rownum, len(headers)), [row_out], value_input_option="USER_ENTERED")
+        _fetch_finanzas_values.clear()
 
         if anular:
             st.success(f"🗑️ Movimiento anulado por {editor}.")
@@ -477,8 +527,10 @@ def _form_ingreso_gasto(tipo: str, cats_existentes: list[str]):
                 headers = _ensure_sheet_headers(ws)
                 row_out = [record.get(h,"") for h in headers]
                 ws.append_row(row_out, value_input_option="USER_ENTERED")
-                st.success(f"✅ {tipo} registrado")
+                _fetch_finanzas_values.clear()
+                st.session_state["aviso_registro"] = f"✅ {tipo} registrado"
                 st.session_state["categoria_activa"] = ""  # reset después de guardar
+                st.rerun()  # para que resumen y ajustes incluyan el nuevo registro
             else:
                 st.error("⚠️ Debes completar todos los campos obligatorios.")
 
@@ -487,7 +539,7 @@ def _form_ingreso_gasto(tipo: str, cats_existentes: list[str]):
 # Render principal
 # =========================
 
-def render():
+def render(df: pd.DataFrame):
     col1, col2 = st.columns([3,1])
     with col1:
         st.markdown("### Panel de Control")
@@ -501,8 +553,6 @@ def render():
             st.success("BD actualizada ✅")
             st.rerun()
 
-    df_raw = _load_finanzas_df()
-    df = _normalize_finanzas(df_raw)
     cats_existentes = sorted(df["Categoría"].dropna().unique().tolist())
 
     tab_resumen, tab_form = st.tabs(["📊 Resumen","➕ Registrar / Editar"])
@@ -587,12 +637,9 @@ def render():
         else:
             _form_editar_anular(df)
                   
-render()
 
 
-def render_ajustes():
-    df_raw = _load_finanzas_df()
-    df = _normalize_finanzas(df_raw)
+def render_ajustes(df: pd.DataFrame):
     ajustes_data = _calc_ajustes_gastos(df)
 
     st.markdown("#### Ajustes para cuadrar gastos")
@@ -640,8 +687,6 @@ def render_ajustes():
     else:
         st.success("🎉 Todos han gastado lo mismo, no se requieren ajustes.")
 
-render_ajustes()
-
 
 def render_footer():
     # =========================
@@ -663,4 +708,59 @@ def render_footer():
         unsafe_allow_html=True
     )
 
-render_footer()
\ No newline at end of file
+
+# =========================
+# Arranque
+# =========================
+
+def _warm_up_worker():
+    try:
+        t = time.perf_counter()
+        _fetch_finanzas_values()
+        log.info("Conexión y hoja precargadas en %.2fs", time.perf_counter() - t)
+    except Exception as e:
+        log.warning("No se pudo precargar la hoja '%s': %s", HOJA, e)
+        with arranque.lock:
+            arranque.estado["warm_error"] = e
+
+def _warm_up():
+    """Lanza una vez por proceso, en segundo plano, la conexión y la lectura de la hoja"""
+    with arranque.lock:
+        if arranque.estado["warm_thread"] is not None:
+            return
+        hilo = threading.Thread(target=_warm_up_worker, name="finanzas-warm-up", daemon=True)
+        arranque.estado["warm_thread"] = hilo
+    hilo.start()
+
+def _await_warm_up():
+    """Espera la precarga; si falló, informa ese error en vez de reintentar"""
+    hilo = arranque.estado["warm_thread"]
+    if hilo is not None:
+        hilo.join()
+    with arranque.lock:
+        error, arranque.estado["warm_error"] = arranque.estado["warm_error"], None
+    if error is not None:
+        raise error
+
+def main():
+    t_run = time.perf_counter()
+    _warm_up()
+    setup_app()
+
+    df = _normalize_finanzas(_load_finanzas_df())
+    render(df)
+    render_ajustes(df)
+    render_footer()
+
+    fin = time.perf_counter()
+    with arranque.lock:
+        primera = not arranque.estado["primera_pagina_hecha"]
+        arranque.estado["primera_pagina_hecha"] = True
+    if primera:
+        log.info("Primera página del proceso renderizada en %.2fs", fin - arranque.T_PROCESO)
+    else:
+        log.debug("Rerun renderizado en %.2fs", fin - t_run)
+
+
+if __name__ == "__main__":
+    main()
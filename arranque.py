@@ -0,0 +1,20 @@
+"""Estado del proceso de la app.
+
+Streamlit vuelve a ejecutar app.py en cada rerun y los botones de
+actualizar limpian st.cache_resource; este módulo se importa una sola vez
+por proceso, así que lo que guarda aquí dura hasta que el proceso termina.
+"""
+import threading
+import time
+
+# Momento en que el proceso empezó a ejecutar la app (app.py lo importa
+# antes que cualquier otra cosa)
+T_PROCESO = time.perf_counter()
+
+lock = threading.Lock()
+
+estado = {
+    "warm_thread": None,   # hilo que precarga la hoja
+    "warm_error": None,    # excepción de la precarga, aún no informada
+    "primera_pagina_hecha": False,  # ya se midió la primera página
+}